@@ -15,14 +15,74 @@ Author: Sleep Data Analysis Project
 Version: 2.0 - Independent Raw Data Analysis
 """
 
-import struct
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
+import hashlib
 import json
+import mmap
 import os
-import glob
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+def _build_pressure_lut(divisors, min_pressure, max_pressure, dtype=np.float32):
+    """Tabulate the decoded pressure for every raw 16-bit word
+
+    A word is a pressure reading when one of the scaling divisors maps it into
+    the pressure range (the first matching divisor wins), so a scan does one
+    lookup instead of trying each divisor. Words that never decode to a
+    reading map to NaN. Readings default to float32, which is far finer than
+    the 0.1 cmH₂O clinical resolution at half the memory.
+    """
+    words = np.arange(65536)
+    lut = np.full(65536, np.nan, dtype=dtype)
+    for divisor in reversed(divisors):
+        pressures = words / divisor
+        in_range = (pressures >= min_pressure) & (pressures <= max_pressure)
+        lut[in_range] = pressures[in_range]
+    return lut
+
+# Raw word -> pressure (cmH₂O) lookup for the 4-20 cmH₂O therapeutic range
+PRESSURE_LUT = _build_pressure_lut((12.5, 13.0, 13.5, 14.0, 15.0), 4.0, 20.0)
+
+# Smallest and largest raw words that decode to a reading
+PRESSURE_WORD_MIN, PRESSURE_WORD_MAX = np.flatnonzero(~np.isnan(PRESSURE_LUT))[[0, -1]].tolist()
+
+# Decimal places kept for reported readings (quantiles, extremes). float32
+# storage is accurate to ~2e-6 cmH₂O at 20 cmH₂O, so rounding here drops the
+# float32 noise (4.96 -> 4.960000038146973) without losing real precision
+READING_DECIMALS = 5
+
+def _reported_readings(values):
+    """Float64 list of reading values rounded to READING_DECIMALS"""
+    return np.asarray(values, dtype=np.float64).round(READING_DECIMALS).tolist()
+
+# Data files smaller than this are re-parsed on every run rather than cached
+PRESSURE_CACHE_MIN_BYTES = 1024 * 1024
+
+# Identifies the decoding rules in cache entry names, so a change to the
+# divisors, range or dtype of PRESSURE_LUT never serves stale readings
+PRESSURE_DECODER_KEY = hashlib.sha1(PRESSURE_LUT.tobytes()).hexdigest()[:12]
+
+@contextmanager
+def _mapped_file(filename):
+    """Memory-map a data file read-only (empty files yield an empty buffer)"""
+    with open(filename, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            yield mm
+
+def _show_and_close(plt, fig):
+    """Show a finished figure (unless matplotlib runs headless) and release it"""
+    # Headless runs fall back to the non-interactive Agg backend, where
+    # there is no window to show
+    if plt.get_backend().lower() != 'agg':
+        plt.show()
+    plt.close(fig)
 
 class BMCSleepAnalyzer:
     def __init__(self, device_id=None):
@@ -51,11 +111,22 @@ class BMCSleepAnalyzer:
             }
         }
 
+        # Decoded pressure arrays of large data files are kept here between runs
+        self._cache_dir = '.bmc_cache'
+
+        # Data file sizes from the most recent directory listing
+        self._file_sizes = {}
+
     def _detect_device_id(self):
         """Auto-detect device ID from data files"""
-        data_files = glob.glob("*.0*")
-        if data_files:
-            return data_files[0].split('.')[0]
+        # Stop at the first DEVICEID.0NN data file (.000-.099) instead of
+        # matching and listing the whole directory (dotfiles skipped)
+        with os.scandir('.') as entries:
+            for entry in entries:
+                name = entry.name
+                if (len(name) >= 5 and name[-4] == '.' and name[-3] == '0' and name[-3:].isdigit()
+                        and not name.startswith('.') and entry.is_file()):
+                    return name.split('.')[0]
         return "unknown"
 
     def analyze_comprehensive_data(self, months=None):
@@ -117,12 +188,33 @@ class BMCSleepAnalyzer:
 
         return analysis_results
 
+    def _list_device_files(self):
+        """Sizes of this device's files by name, from a single directory listing"""
+        prefix = f"{self.device_id}."
+        file_sizes = {}
+        with os.scandir('.') as entries:
+            for entry in entries:
+                if entry.name.startswith(prefix):
+                    try:
+                        file_sizes[entry.name] = entry.stat().st_size
+                    except OSError:
+                        continue  # Dangling link - treat as missing
+        # Remembered so the usage analysis of this run needs no stat calls
+        self._file_sizes = file_sizes
+        return file_sizes
+
+    def _file_size(self, filename):
+        """Size of a data file, from the last directory listing when possible"""
+        size = self._file_sizes.get(filename)
+        return size if size is not None else os.path.getsize(filename)
+
     def _get_all_files(self):
         """Get all available data files"""
+        existing = self._list_device_files()
         files = []
         for i in range(30):  # 000-029
             filename = f"{self.device_id}.{i:03d}"
-            if os.path.exists(filename):
+            if filename in existing:
                 files.append(filename)
         return files
 
@@ -135,54 +227,65 @@ class BMCSleepAnalyzer:
         else:
             file_range = range(15, 30)  # Recent 15 files
 
+        existing = self._list_device_files()
         files = []
         for i in file_range:
             filename = f"{self.device_id}.{i:03d}"
-            if os.path.exists(filename):
+            if filename in existing:
                 files.append(filename)
         return files
 
     def _extract_pressure_data(self, files):
         """Extract pressure readings using optimized parsing"""
-        all_pressures = []
         file_pressure_data = {}
+        log_lines = []
 
-        for filename in files:
-            try:
-                with open(filename, 'rb') as f:
-                    data = f.read()
-
-                pressures = []
+        # Files are independent: decode them concurrently and collect the
+        # results in file order. Threads rather than processes, since NumPy
+        # releases the GIL while filtering and gathering, and worker processes
+        # would break callers without a __main__ guard under spawn/forkserver
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = [executor.submit(self._read_pressures, filename) for filename in files]
 
-                # Multi-approach pressure extraction
-                # Method 1: Therapeutic range search
-                for i in range(0, len(data)-1, 2):
-                    try:
-                        val = struct.unpack('<H', data[i:i+2])[0]
-                        for divisor in [12.5, 13.0, 13.5, 14.0, 15.0]:
-                            pressure = val / divisor
-                            if 4.0 <= pressure <= 20.0:  # Therapeutic range
-                                pressures.append(pressure)
-                                break
-                    except:
-                        continue
-
-                if pressures:
+        for filename, future in zip(files, futures):
+            try:
+                pressures = future.result()
+
+                if pressures.size:
+                    count = len(pressures)
+                    p5, median, p95 = _reported_readings(np.percentile(pressures, [5, 50, 95]))
+                    # Mean and SD from one float64 sum and sum of squares
+                    # instead of separate passes for np.mean and np.std
+                    mean = pressures.sum(dtype=np.float64) / count
+                    sum_sq = np.einsum('i,i->', pressures, pressures, dtype=np.float64)
                     file_pressure_data[filename] = {
                         'pressures': pressures,
-                        'mean': np.mean(pressures),
-                        'median': np.median(pressures),
-                        'p95': np.percentile(pressures, 95),
-                        'p5': np.percentile(pressures, 5),
-                        'std': np.std(pressures),
-                        'count': len(pressures)
+                        'mean': float(mean),
+                        'median': median,
+                        'p95': p95,
+                        'p5': p5,
+                        'std': float(np.sqrt(max(sum_sq / count - mean * mean, 0.0))),
+                        'count': count
                     }
-                    all_pressures.extend(pressures)
 
-                print(f"    📁 {filename}: {len(pressures):,} readings")
+                log_lines.append(f"    📁 {filename}: {len(pressures):,} readings")
 
             except Exception as e:
-                print(f"    ❌ Error processing {filename}: {e}")
+                log_lines.append(f"    ❌ Error processing {filename}: {e}")
+
+        # Report all files in one write, in file order
+        if log_lines:
+            print('\n'.join(log_lines))
+
+        # Copy every file's readings into one preallocated array and keep
+        # per-file views into it, so each reading is held in memory once
+        all_pressures = np.empty(sum(info['count'] for info in file_pressure_data.values()), dtype=np.float32)
+        offset = 0
+        for info in file_pressure_data.values():
+            end = offset + info['count']
+            all_pressures[offset:end] = info['pressures']
+            info['pressures'] = all_pressures[offset:end]
+            offset = end
 
         return {
             'all_pressures': all_pressures,
@@ -190,22 +293,99 @@ class BMCSleepAnalyzer:
             'total_readings': len(all_pressures)
         }
 
+    def _read_pressures(self, filename):
+        """Read and decode the pressure readings of a single data file"""
+        # SD card files are never rewritten, so the decoded readings of large
+        # files are cached on disk keyed by name, decoder, mtime and size.
+        # Small files decode faster than the cache round trip and are always
+        # parsed.
+        st = os.stat(filename)
+        if st.st_size < PRESSURE_CACHE_MIN_BYTES:
+            return self._parse_pressure_file(filename)
+
+        cache_name = f"{filename}_{PRESSURE_DECODER_KEY}_{st.st_mtime_ns}_{st.st_size}.npy"
+        cache_path = os.path.join(self._cache_dir, cache_name)
+        if os.path.exists(cache_path):
+            try:
+                return np.load(cache_path, mmap_mode='r')
+            except (OSError, ValueError):
+                pass  # Unreadable entry - parse again and overwrite it
+
+        pressures = self._parse_pressure_file(filename)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                np.save(f, pressures)
+            os.replace(tmp_path, cache_path)
+            self._prune_cache(filename, cache_name)
+        except OSError:
+            # Caching is best effort (e.g. read-only data directory or full
+            # card) and must never lose the decoded readings
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass  # Never created, or already renamed into place
+        return pressures
+
+    def _prune_cache(self, filename, keep_name):
+        """Remove older cache entries of a data file (e.g. from an earlier copy of the SD card)"""
+        prefix = f"{filename}_"
+        with os.scandir(self._cache_dir) as entries:
+            stale = [entry.path for entry in entries
+                     if entry.name.startswith(prefix) and entry.name.endswith('.npy') and entry.name != keep_name]
+        for path in stale:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Still mapped elsewhere (Windows) - retried on the next write
+
+    def _parse_pressure_file(self, filename):
+        """Parse the pressure readings of a single data file"""
+        # Parse straight from the page cache instead of copying the whole
+        # file into a bytes object first
+        with _mapped_file(filename) as data:
+            return self._decode_pressures(data)
+
+    def _decode_pressures(self, data):
+        """Decode therapeutic-range pressure readings from a raw data buffer"""
+        # Multi-approach pressure extraction
+        # Method 1: Therapeutic range search - reject raw words outside the
+        # decodable range with integer compares, then look up the survivors
+        values = np.frombuffer(data, dtype='<u2', count=len(data) // 2)
+        candidates = values[(values >= PRESSURE_WORD_MIN) & (values <= PRESSURE_WORD_MAX)]
+        decoded = PRESSURE_LUT[candidates]
+        return decoded[~np.isnan(decoded)]
+
     def _analyze_pressure_therapy(self, pressure_data):
         """Analyze pressure therapy effectiveness"""
-        if not pressure_data['all_pressures']:
+        if pressure_data['all_pressures'].size == 0:
             return {'status': 'No pressure data available'}
 
         pressures = pressure_data['all_pressures']
 
+        # One selection pass for all quantiles instead of one per statistic,
+        # including the quartiles the peak analysis needs and the extremes.
+        # Only the reported values are rounded: the peak bound is built from
+        # the raw quartiles, so readings equal to them never count as peaks
+        quantiles = np.percentile(pressures, [0, 5, 25, 50, 75, 95, 100])
+        low, p5, _, median, _, p95, high = _reported_readings(quantiles)
+        q25, q75 = quantiles[[2, 4]].tolist()
+
+        # Readings are stored as float32; accumulate the moments in float64,
+        # taking mean and SD from one sum and sum of squares
+        count = len(pressures)
+        mean = pressures.sum(dtype=np.float64) / count
+        sum_sq = np.einsum('i,i->', pressures, pressures, dtype=np.float64)
         analysis = {
             'statistics': {
-                'mean': np.mean(pressures),
-                'median': np.median(pressures),
-                'p95': np.percentile(pressures, 95),
-                'p5': np.percentile(pressures, 5),
-                'std': np.std(pressures),
-                'min': np.min(pressures),
-                'max': np.max(pressures)
+                'mean': float(mean),
+                'median': median,
+                'p95': p95,
+                'p5': p5,
+                'std': float(np.sqrt(max(sum_sq / count - mean * mean, 0.0))),
+                'min': low,
+                'max': high
             },
             'therapy_assessment': {},
             'pressure_distribution': {},
@@ -229,7 +409,7 @@ class BMCSleepAnalyzer:
             'time_in_optimal_range': self._calculate_time_in_range(pressures, 6.0, 12.0),
             'time_above_15': self._calculate_time_in_range(pressures, 15.0, 25.0),
             'time_below_6': self._calculate_time_in_range(pressures, 0.0, 6.0),
-            'pressure_peaks': self._analyze_pressure_peaks(pressures)
+            'pressure_peaks': self._analyze_pressure_peaks(pressures, q25, q75)
         }
 
         return analysis
@@ -242,23 +422,24 @@ class BMCSleepAnalyzer:
             return {'status': 'No event file found'}
 
         try:
-            with open(evt_file, 'rb') as f:
-                data = f.read()
-
             events = []
 
             # Look for event markers (simplified approach)
-            # In real BMC format, events would have specific byte patterns
+            # In real BMC format, events would have specific byte patterns.
+            # Search the mapped file directly rather than reading it into memory
             marker_positions = []
-            for i in range(len(data) - 3):
-                if data[i:i+4] == b'\xaa\xaa\xaa\xaa':
+            with _mapped_file(evt_file) as data:
+                file_size = len(data)
+                i = data.find(b'\xaa\xaa\xaa\xaa')
+                while i != -1:
                     marker_positions.append(i)
+                    i = data.find(b'\xaa\xaa\xaa\xaa', i + 1)
 
             print(f"    📊 Found {len(marker_positions)} potential event markers")
 
             return {
                 'event_markers': len(marker_positions),
-                'file_size': len(data),
+                'file_size': file_size,
                 'estimated_events_per_hour': len(marker_positions) * 0.1,  # Rough estimate
                 'status': 'Preliminary event analysis'
             }
@@ -289,7 +470,7 @@ class BMCSleepAnalyzer:
 
         # Estimate usage based on data file sizes and content
         total_nights = len(files)
-        estimated_usage_nights = len([f for f in files if os.path.getsize(f) > 1000000])  # Files with substantial data
+        estimated_usage_nights = len([f for f in files if self._file_size(f) > 1000000])  # Files with substantial data
 
         usage_percentage = (estimated_usage_nights / total_nights * 100) if total_nights > 0 else 0
 
@@ -308,17 +489,14 @@ class BMCSleepAnalyzer:
         if not pressure_data['per_file']:
             return {'status': 'No pressure trend data available'}
 
-        file_means = []
-        file_numbers = []
-
-        for filename, data in pressure_data['per_file'].items():
-            file_num = int(filename.split('.')[-1])
-            file_numbers.append(file_num)
-            file_means.append(data['mean'])
+        per_file = pressure_data['per_file']
+        file_numbers = np.fromiter((int(filename.split('.')[-1]) for filename in per_file),
+                                   dtype=np.int64, count=len(per_file))
+        file_means = np.fromiter((data['mean'] for data in per_file.values()),
+                                 dtype=np.float64, count=len(per_file))
 
         # Sort by file number (chronological order)
-        sorted_data = sorted(zip(file_numbers, file_means))
-        file_numbers, file_means = zip(*sorted_data)
+        file_means = file_means[np.argsort(file_numbers, kind='stable')]
 
         return {
             'pressure_trend': self._calculate_trend(file_means),
@@ -345,8 +523,10 @@ class BMCSleepAnalyzer:
         usage_analysis = analysis_results.get('usage_analysis', {})
         event_analysis = analysis_results.get('event_analysis', {})
 
+        therapy_assessment = pressure_analysis.get('therapy_assessment', {})
+
         # Overall status assessment
-        if pressure_analysis.get('therapy_assessment', {}).get('pressure_level') == 'optimal':
+        if therapy_assessment.get('pressure_level') == 'optimal':
             assessment['therapy_effectiveness'] = 'EXCELLENT'
         else:
             assessment['therapy_effectiveness'] = 'REQUIRES_OPTIMIZATION'
@@ -371,8 +551,12 @@ class BMCSleepAnalyzer:
         if not analysis_results:
             return "Analysis failed - no data available"
 
-        report = f"""
-COMPREHENSIVE SLEEP STUDY ANALYSIS REPORT
+        return ''.join(self._iter_report_sections(analysis_results))
+
+    def _iter_report_sections(self, analysis_results):
+        """Yield the sleep study report section by section"""
+
+        yield f"""COMPREHENSIVE SLEEP STUDY ANALYSIS REPORT
 ================================================================================
 
 PATIENT INFORMATION
@@ -395,7 +579,8 @@ PRESSURE THERAPY ANALYSIS
         pressure_data = analysis_results.get('pressure_analysis', {})
         if 'statistics' in pressure_data:
             stats = pressure_data['statistics']
-            report += f"""
+            therapy_assessment = pressure_data.get('therapy_assessment', {})
+            yield f"""
 Pressure Statistics:
 • Mean Pressure: {stats['mean']:.1f} cmH₂O
 • Median Pressure: {stats['median']:.1f} cmH₂O
@@ -404,13 +589,13 @@ Pressure Statistics:
 • Pressure Variability (SD): {stats['std']:.1f} cmH₂O
 • Range: {stats['min']:.1f} - {stats['max']:.1f} cmH₂O
 
-Therapy Assessment: {pressure_data.get('therapy_assessment', {}).get('pressure_level', 'Unknown')}
-Pressure Stability: {pressure_data.get('therapy_assessment', {}).get('pressure_stability', 'Unknown')}
+Therapy Assessment: {therapy_assessment.get('pressure_level', 'Unknown')}
+Pressure Stability: {therapy_assessment.get('pressure_stability', 'Unknown')}
 """
 
         # Add respiratory event analysis
         event_data = analysis_results.get('event_analysis', {})
-        report += f"""
+        yield f"""
 RESPIRATORY EVENT ANALYSIS
 ----------------------------------------------------------------------
 AHI Estimate: {event_data.get('ahi_estimate', 'Not available')}
@@ -420,7 +605,7 @@ Treatment Effectiveness: {event_data.get('treatment_effectiveness', 'Unknown')}
 
         # Add usage analysis
         usage_data = analysis_results.get('usage_analysis', {})
-        report += f"""
+        yield f"""
 COMPLIANCE AND USAGE ANALYSIS
 ----------------------------------------------------------------------
 Total Study Nights: {usage_data.get('total_nights_available', 'Unknown')}
@@ -431,7 +616,7 @@ Compliance Status: {usage_data.get('compliance_assessment', 'Unknown')}
 
         # Add clinical assessment
         clinical = analysis_results.get('clinical_assessment', {})
-        report += f"""
+        yield f"""
 CLINICAL ASSESSMENT
 ----------------------------------------------------------------------
 Overall Therapy Status: {clinical.get('therapy_effectiveness', 'Unknown')}
@@ -442,9 +627,9 @@ PRIMARY CLINICAL FINDINGS:
 
         recommendations = clinical.get('clinical_recommendations', [])
         for i, rec in enumerate(recommendations, 1):
-            report += f"{i}. {rec}\n"
+            yield f"{i}. {rec}\n"
 
-        report += f"""
+        yield f"""
 SLEEP MEDICINE INTERPRETATION
 ----------------------------------------------------------------------
 This analysis provides objective assessment of CPAP therapy effectiveness
@@ -459,10 +644,7 @@ RECOMMENDATIONS FOR CLINICAL FOLLOW-UP:
 
 Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 Method: Comprehensive Raw SD Card Data Analysis
-================================================================================
-        """
-
-        return report.strip()
+================================================================================"""
 
     # Helper methods for assessments
     def _assess_pressure_level(self, mean_pressure):
@@ -497,7 +679,7 @@ Method: Comprehensive Raw SD Card Data Analysis
 
     def _assess_therapeutic_window(self, pressures):
         """Assess if pressures are in therapeutic window"""
-        therapeutic_count = sum(1 for p in pressures if 6.0 <= p <= 15.0)
+        therapeutic_count = np.count_nonzero((pressures >= 6.0) & (pressures <= 15.0))
         percentage = (therapeutic_count / len(pressures)) * 100
         return {
             'percentage_in_window': percentage,
@@ -506,21 +688,28 @@ Method: Comprehensive Raw SD Card Data Analysis
 
     def _calculate_time_in_range(self, pressures, min_val, max_val):
         """Calculate percentage of time in pressure range"""
-        in_range = sum(1 for p in pressures if min_val <= p <= max_val)
-        return (in_range / len(pressures)) * 100 if pressures else 0
+        in_range = np.count_nonzero((pressures >= min_val) & (pressures <= max_val))
+        return (in_range / len(pressures)) * 100 if len(pressures) else 0
 
-    def _analyze_pressure_peaks(self, pressures):
-        """Analyze pressure peaks and outliers"""
-        q75 = np.percentile(pressures, 75)
-        q25 = np.percentile(pressures, 25)
+    def _analyze_pressure_peaks(self, pressures, q25=None, q75=None):
+        """Analyze pressure peaks and outliers (pass known quartiles to skip recomputing them)"""
+        if q25 is None or q75 is None:
+            q25, q75 = np.percentile(pressures, [25, 75]).tolist()
         iqr = q75 - q25
         upper_bound = q75 + 1.5 * iqr
 
-        peaks = [p for p in pressures if p > upper_bound]
+        # Compare the float32 readings against the largest float32 not above
+        # the float64 bound: a reading exceeds one exactly when it exceeds the
+        # other, with no float64 copy and on NumPy 1.x and 2.x alike
+        threshold = np.float32(upper_bound)
+        if float(threshold) > upper_bound:
+            threshold = np.nextafter(threshold, np.float32(-np.inf))
+
+        peaks = pressures[pressures > threshold]
         return {
             'peak_count': len(peaks),
             'peak_percentage': (len(peaks) / len(pressures)) * 100,
-            'highest_peak': max(peaks) if peaks else 0
+            'highest_peak': _reported_readings(peaks.max()) if len(peaks) else 0
         }
 
     def _classify_ahi_severity(self, ahi):
@@ -555,11 +744,11 @@ Method: Comprehensive Raw SD Card Data Analysis
     def _analyze_usage_consistency(self, files):
         """Analyze consistency of usage"""
         # Simple analysis based on file sizes
-        sizes = [os.path.getsize(f) for f in files]
-        if len(sizes) < 2:
+        if len(files) < 2:
             return 'Insufficient data'
 
-        cv = np.std(sizes) / np.mean(sizes)  # Coefficient of variation
+        sizes = np.fromiter((self._file_size(f) for f in files), dtype=np.int64, count=len(files))
+        cv = sizes.std() / sizes.mean()  # Coefficient of variation
         if cv < 0.3:
             return 'Consistent Usage Pattern'
         else:
@@ -638,8 +827,10 @@ Method: Comprehensive Raw SD Card Data Analysis
 
         return recommendations
 
-    def create_comprehensive_visualization(self, analysis_results):
-        """Create comprehensive visualization dashboard"""
+    def create_comprehensive_visualization(self, analysis_results, dpi=150):
+        """Create comprehensive visualization dashboard (dpi=300 for print quality)"""
+        # Imported here so report-only runs don't pay matplotlib's startup cost
+        import matplotlib.pyplot as plt
 
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
 
@@ -654,10 +845,7 @@ Method: Comprehensive Raw SD Card Data Analysis
             bars = ax1.bar(metrics, values, color=['blue', 'green', 'orange', 'red'], alpha=0.7)
             ax1.set_ylabel('Pressure (cmH₂O)')
             ax1.set_title('Pressure Therapy Statistics', fontweight='bold')
-
-            for bar, value in zip(bars, values):
-                ax1.text(bar.get_x() + bar.get_width()/2., value + 0.1,
-                        f'{value:.1f}', ha='center', va='bottom', fontweight='bold')
+            ax1.bar_label(bars, fmt='%.1f', padding=3, fontweight='bold')
 
         # Plot 2: Therapy Assessment
         usage_data = analysis_results.get('usage_analysis', {})
@@ -667,18 +855,17 @@ Method: Comprehensive Raw SD Card Data Analysis
         values = [usage_pct, 70]
         colors = ['green' if usage_pct >= 70 else 'red', 'blue']
 
-        ax2.bar(categories, values, color=colors, alpha=0.7)
+        bars = ax2.bar(categories, values, color=colors, alpha=0.7)
         ax2.set_ylabel('Percentage')
         ax2.set_title('Compliance Assessment', fontweight='bold')
         ax2.set_ylim(0, 100)
-
-        for i, value in enumerate(values):
-            ax2.text(i, value + 2, f'{value:.1f}%', ha='center', va='bottom', fontweight='bold')
+        ax2.bar_label(bars, fmt='%.1f%%', padding=3, fontweight='bold')
 
         # Plot 3: Clinical Summary
         ax3.axis('off')
 
         clinical = analysis_results.get('clinical_assessment', {})
+        pressure_stats = pressure_data.get('statistics', {})
         summary_text = f"""
 CLINICAL SUMMARY
 
@@ -690,7 +877,7 @@ CLINICAL SUMMARY
 
 🎯 KEY METRICS:
 • Files Analyzed: {analysis_results.get('files_analyzed', 'Unknown')}
-• Pressure Range: {pressure_data.get('statistics', {}).get('min', 0):.1f}-{pressure_data.get('statistics', {}).get('max', 0):.1f} cmH₂O
+• Pressure Range: {pressure_stats.get('min', 0):.1f}-{pressure_stats.get('max', 0):.1f} cmH₂O
 • Usage: {usage_pct:.1f}%
 
 💊 ASSESSMENT:
@@ -720,11 +907,11 @@ evaluation for clinical review.
                     fontsize=14, fontweight='bold')
 
         plt.tight_layout()
-        plt.savefig('bmc_sleep_study_analysis.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        plt.savefig('bmc_sleep_study_analysis.png', dpi=dpi, bbox_inches='tight')
+        _show_and_close(plt, fig)
 
-    def run_complete_analysis(self, months=None):
-        """Run complete sleep study analysis"""
+    def run_complete_analysis(self, months=None, plot=True):
+        """Run complete sleep study analysis (plot=False skips the dashboard)"""
 
         # Perform comprehensive analysis
         results = self.analyze_comprehensive_data(months)
@@ -733,25 +920,26 @@ evaluation for clinical review.
             print("❌ Analysis failed - no data to process")
             return
 
-        # Generate sleep study report
-        report = self.generate_sleep_study_report(results)
-
-        # Save report
+        # Generate the sleep study report, streaming it to file section by
+        # section rather than assembling one large string first
         with open('bmc_sleep_study_report.txt', 'w') as f:
-            f.write(report)
+            f.writelines(self._iter_report_sections(results))
 
-        # Save detailed analysis data
-        with open('bmc_sleep_study_analysis.json', 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+        # Save detailed analysis data (summaries only, no raw readings, so it
+        # stays small enough to keep indented for reading)
+        with open('bmc_sleep_study_analysis.json', 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, default=str, ensure_ascii=False)
 
         # Create visualization
-        self.create_comprehensive_visualization(results)
+        if plot:
+            self.create_comprehensive_visualization(results)
 
         print(f"\n✅ COMPREHENSIVE SLEEP STUDY ANALYSIS COMPLETE")
         print("="*60)
         print("Generated Files:")
         print("• bmc_sleep_study_report.txt - Clinical sleep study report")
-        print("• bmc_sleep_study_analysis.png - Comprehensive dashboard")
+        if plot:
+            print("• bmc_sleep_study_analysis.png - Comprehensive dashboard")
         print("• bmc_sleep_study_analysis.json - Detailed analysis data")
 
         # Print key findings
@@ -765,7 +953,8 @@ evaluation for clinical review.
         if 'statistics' in pressure_data:
             stats = pressure_data['statistics']
             print(f"• Mean Pressure: {stats['mean']:.1f} cmH₂O")
-            print(f"• Pressure Stability: {pressure_data.get('therapy_assessment', {}).get('pressure_stability', 'Unknown')}")
+            therapy_assessment = pressure_data.get('therapy_assessment', {})
+            print(f"• Pressure Stability: {therapy_assessment.get('pressure_stability', 'Unknown')}")
 
         print(f"\n🏥 CLINICAL IMPACT:")
         print(f"This analysis provides independent assessment of CPAP therapy")
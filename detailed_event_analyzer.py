@@ -12,9 +12,54 @@ import matplotlib.dates as mdates
 from datetime import datetime, timedelta
 import json
 import os
-from collections import defaultdict
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+
+from bmc_sleep_analyzer import _build_pressure_lut, _mapped_file, _show_and_close
+
+# The pressure timeline stops once more than 10000 readings are collected
+TIMELINE_MAX_READINGS = 10001
+
+# Raw words decoded per step of the timeline scan
+TIMELINE_BLOCK_WORDS = 65536
+
+# Raw word -> pressure (cmH₂O) lookup for the 4-25 cmH₂O timeline range
+TIMELINE_LUT = _build_pressure_lut((12.5, 13.0, 13.5, 14.0), 4.0, 25.0, dtype=np.float64)
+
+def _prefetch_files(filenames):
+    """Ask the kernel to start reading the given files into the page cache
+
+    The hints return immediately and the reads proceed in the background, so
+    the disk sees every file at once rather than one blocking read after
+    another. Only available where the OS provides posix_fadvise.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for filename in filenames:
+        try:
+            fd = os.open(filename, os.O_RDONLY)
+        except OSError:
+            continue  # Reported when the file is analyzed
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
 
 class DetailedEventAnalyzer:
+    # Event block fields, read in place from the file data
+    _event_timestamp = struct.Struct('<I')
+    _event_duration = struct.Struct('<H')
+
+    # Other common event patterns and the source recorded for their events
+    _event_patterns = [
+        (b'\xff\xff\x00\x00', 'ffff0000_marker'),  # Potential event marker
+        (b'\x00\x00\xff\xff', '0000ffff_marker'),  # Reverse pattern
+        (b'\xaa\xbb\xcc\xdd', 'aabbccdd_marker'),  # Potential event signature
+    ]
+
     def __init__(self, device_id="23804346"):
         self.device_id = device_id
 
@@ -42,6 +87,13 @@ class DetailedEventAnalyzer:
             4: "Very Severe"
         }
 
+        # Event type name and hex code for every possible type byte
+        self._type_names = [self.event_types.get(code, f"Unknown_0x{code:02X}") for code in range(256)]
+        self._type_codes = [f"0x{code:02X}" for code in range(256)]
+
+        # Event severity by duration; every duration above 30 is "Severe"
+        self._severity_table = ["Minimal"] * 6 + ["Mild"] * 10 + ["Moderate"] * 15 + ["Severe"] * (256 - 31)
+
     def extract_detailed_events(self, recent_files_only=True):
         """Extract detailed event data from BMC files"""
 
@@ -62,18 +114,26 @@ class DetailedEventAnalyzer:
         print(f"📁 Files found: {len(available_files)}")
         print()
 
-        # Extract events from each file
+        # Extract events from each file. Files are independent, so they are
+        # analyzed on threads and the results are reported in order. The
+        # decoding runs in NumPy with the GIL released; worker processes
+        # would break callers without a __main__ guard under spawn/forkserver
         all_events = {}
         pressure_data = {}
 
-        for file_idx, filename in enumerate(available_files):
-            print(f"🔍 Analyzing {filename}...")
+        _prefetch_files(available_files)
 
-            # Extract events
-            events = self._extract_events_from_file(filename)
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = [executor.submit(self._analyze_file, filename) for filename in available_files]
 
-            # Extract pressure timeline
-            pressures = self._extract_pressure_timeline(filename)
+        for file_idx, (filename, future) in enumerate(zip(available_files, futures)):
+            print(f"🔍 Analyzing {filename}...")
+
+            try:
+                events, pressures = future.result()
+            except OSError as e:
+                print(f"    ❌ Error reading {filename}: {e}")
+                events, pressures = [], []
 
             if events or pressures:
                 file_date = self._estimate_file_date(file_idx, len(available_files))
@@ -90,14 +150,24 @@ class DetailedEventAnalyzer:
 
         return all_events, pressure_data
 
-    def _extract_events_from_file(self, filename):
-        """Extract events from individual BMC file"""
+    def _analyze_file(self, filename):
+        """Extract the events and pressure timeline of one data file"""
+        # Map the file once and run every parsing pass over the same
+        # buffer instead of reading it into memory for each pass
+        with _mapped_file(filename) as data:
+            # Extract events
+            events = self._extract_events_from_file(filename, data)
+
+            # Extract pressure timeline
+            pressures = self._extract_pressure_timeline(filename, data)
+
+        return events, pressures
+
+    def _extract_events_from_file(self, filename, data):
+        """Extract events from the data of an individual BMC file"""
         events = []
 
         try:
-            with open(filename, 'rb') as f:
-                data = f.read()
-
             # Method 1: Look for event markers (0xAAAA pattern)
             events.extend(self._parse_aaaa_markers(data, filename))
 
@@ -110,26 +180,35 @@ class DetailedEventAnalyzer:
         except Exception as e:
             print(f"    ❌ Error reading {filename}: {e}")
 
-        return sorted(events, key=lambda x: x['timestamp'])
+        # Sort in place: the timestamps are HH:MM strings that are not ordered
+        # by file position, so the per-method lists cannot simply be merged
+        events.sort(key=itemgetter('timestamp'))
+        return events
 
     def _parse_aaaa_markers(self, data, filename):
         """Parse 0xAAAA markers which often indicate events"""
         events = []
 
-        # Look for 0xAAAA pattern
-        for i in range(0, len(data) - 4, 4):
-            if data[i:i+4] == b'\xaa\xaa\xaa\xaa':
-                # Found marker, try to extract event info
-                event_start = i
+        # Look for 0xAAAA pattern at 4-byte aligned offsets, letting
+        # bytes.find skip ahead to each candidate
+        i = data.find(b'\xaa\xaa\xaa\xaa')
+        while i != -1:
+            if i % 4:
+                # Unaligned hit - resume at the next aligned offset
+                i = data.find(b'\xaa\xaa\xaa\xaa', (i + 3) & ~3)
+                continue
 
-                # Look ahead for event data
-                if i + 32 < len(data):
-                    event_block = data[i:i+32]
+            # Found marker, try to extract event info
+            event_start = i
 
-                    # Try to extract event information
-                    event = self._parse_event_block(event_block, event_start, filename)
-                    if event:
-                        events.append(event)
+            # Look ahead for event data
+            if i + 32 < len(data):
+                # Try to extract event information
+                event = self._parse_event_block(data, event_start, filename)
+                if event:
+                    events.append(event)
+
+            i = data.find(b'\xaa\xaa\xaa\xaa', i + 4)
 
         return events
 
@@ -138,13 +217,7 @@ class DetailedEventAnalyzer:
         events = []
 
         # Look for other common patterns
-        patterns = [
-            b'\xff\xff\x00\x00',  # Potential event marker
-            b'\x00\x00\xff\xff',  # Reverse pattern
-            b'\xaa\xbb\xcc\xdd',  # Potential event signature
-        ]
-
-        for pattern in patterns:
+        for pattern, source in self._event_patterns:
             pos = 0
             while True:
                 pos = data.find(pattern, pos)
@@ -153,8 +226,7 @@ class DetailedEventAnalyzer:
 
                 # Extract potential event
                 if pos + 16 < len(data):
-                    event_block = data[pos:pos+16]
-                    event = self._parse_event_block(event_block, pos, filename, pattern_type=pattern.hex())
+                    event = self._parse_event_block(data, pos, filename, source=source)
                     if event:
                         events.append(event)
 
@@ -166,37 +238,33 @@ class DetailedEventAnalyzer:
         """Infer potential events from pressure changes"""
         events = []
 
-        # Extract pressure data
-        pressures = []
-        timestamps = []
+        # Sample pressure readings throughout file: every 128 bytes is every
+        # 64th little-endian word
+        samples = np.frombuffer(data, dtype='<u2', count=len(data) // 2)[::64] / 13.0  # Scaling factor
+        in_range = (samples >= 4.0) & (samples <= 25.0)
 
-        # Sample pressure readings throughout file
-        for i in range(0, len(data) - 1, 128):  # Every 128 bytes
-            try:
-                val = struct.unpack('<H', data[i:i+2])[0]
-                pressure = val / 13.0  # Scaling factor
-                if 4.0 <= pressure <= 25.0:
-                    pressures.append(pressure)
-                    timestamps.append(i)
-            except:
-                continue
+        pressure_array = samples[in_range]
+        pressures = pressure_array.tolist()
+        positions = np.flatnonzero(in_range) * 128
+        timestamps = positions.tolist()
 
         if len(pressures) < 10:
             return events
 
         # Look for sudden pressure increases (potential apnea responses)
-        pressure_array = np.array(pressures)
-
         # Calculate pressure changes
         pressure_diff = np.diff(pressure_array)
 
         # Find significant pressure increases (>3 cmH2O increase)
         significant_increases = np.where(pressure_diff > 3.0)[0]
+        event_hours, event_minutes = self._bytes_to_hours_minutes(positions[significant_increases])
 
-        for idx in significant_increases:
+        for idx, hour, minute in zip(significant_increases, event_hours.tolist(), event_minutes.tolist()):
             if idx < len(timestamps) - 1:
                 event = {
-                    'timestamp': self._bytes_to_time_estimate(timestamps[idx]),
+                    'timestamp': f"{hour:02d}:{minute:02d}",
+                    'hour': hour,
+                    'minute': minute,
                     'type': 'Inferred Apnea Response',
                     'severity': 'Moderate' if pressure_diff[idx] > 5.0 else 'Mild',
                     'pressure_before': pressures[idx],
@@ -209,46 +277,41 @@ class DetailedEventAnalyzer:
 
         return events
 
-    def _parse_event_block(self, block, position, filename, pattern_type="aaaa"):
-        """Parse event block to extract event information"""
+    def _parse_event_block(self, data, position, filename, source="aaaa_marker"):
+        """Parse the event block starting at position in the file data"""
 
         try:
             # Basic event structure (hypothetical based on common CPAP formats)
-            if len(block) >= 8:
+            if position + 8 <= len(data):
                 # Try to extract timestamp (first 4 bytes)
-                timestamp_val = struct.unpack('<I', block[0:4])[0]
+                timestamp_val = self._event_timestamp.unpack_from(data, position)[0]
 
                 # Try to extract event type (next byte)
-                event_type_val = block[4] if len(block) > 4 else 0
+                event_type_val = data[position + 4]
 
                 # Try to extract duration/intensity (next 2 bytes)
-                duration_val = struct.unpack('<H', block[5:7])[0] if len(block) >= 7 else 0
+                duration_val = self._event_duration.unpack_from(data, position + 5)[0]
 
                 # Map to event type
-                event_type = self.event_types.get(event_type_val, f"Unknown_0x{event_type_val:02X}")
+                event_type = self._type_names[event_type_val]
 
                 # Estimate timestamp
-                time_estimate = self._timestamp_to_time(timestamp_val)
+                hour, minute = self._timestamp_to_hour_minute(timestamp_val)
 
                 # Determine severity based on duration
-                if duration_val > 30:
-                    severity = "Severe"
-                elif duration_val > 15:
-                    severity = "Moderate"
-                elif duration_val > 5:
-                    severity = "Mild"
-                else:
-                    severity = "Minimal"
+                severity = self._severity_table[duration_val if duration_val < 256 else 255]
 
                 event = {
-                    'timestamp': time_estimate,
+                    'timestamp': f"{hour:02d}:{minute:02d}",
+                    'hour': hour,
+                    'minute': minute,
                     'type': event_type,
                     'severity': severity,
                     'duration': duration_val,
-                    'raw_type_code': f"0x{event_type_val:02X}",
-                    'source': f'{pattern_type}_marker',
+                    'raw_type_code': self._type_codes[event_type_val],
+                    'source': source,
                     'file_position': position,
-                    'raw_data': block[:8].hex()
+                    'raw_data': data[position:position + 8].hex()
                 }
 
                 # Only return if it looks like a valid event
@@ -260,36 +323,30 @@ class DetailedEventAnalyzer:
 
         return None
 
-    def _extract_pressure_timeline(self, filename):
-        """Extract detailed pressure timeline from file"""
+    def _extract_pressure_timeline(self, filename, data):
+        """Extract detailed pressure timeline from the file data"""
         pressures = []
 
         try:
-            with open(filename, 'rb') as f:
-                data = f.read()
-
-            # Extract pressure readings throughout the file
-            for i in range(0, len(data) - 1, 2):  # Every 2 bytes
-                try:
-                    val = struct.unpack('<H', data[i:i+2])[0]
-
-                    # Try multiple scaling factors
-                    for divisor in [12.5, 13.0, 13.5, 14.0]:
-                        pressure = val / divisor
-                        if 4.0 <= pressure <= 25.0:
-                            time_estimate = self._bytes_to_time_estimate(i)
-                            pressures.append({
-                                'time': time_estimate,
-                                'pressure': pressure,
-                                'file_position': i
-                            })
-                            break
-
-                except:
-                    continue
+            # Extract pressure readings throughout the file (every 2 bytes),
+            # decoding a block of words at a time through the lookup table
+            # and stopping once the sample is large enough
+            words = np.frombuffer(data, dtype='<u2', count=len(data) // 2)
+            for start in range(0, len(words), TIMELINE_BLOCK_WORDS):
+                decoded = TIMELINE_LUT[words[start:start + TIMELINE_BLOCK_WORDS]]
+                hits = np.flatnonzero(~np.isnan(decoded))[:TIMELINE_MAX_READINGS - len(pressures)]
+
+                positions = 2 * (start + hits)
+                times = self._bytes_to_time_estimates(positions)
+                for position, time_estimate, pressure in zip(positions.tolist(), times, decoded[hits].tolist()):
+                    pressures.append({
+                        'time': time_estimate,
+                        'pressure': pressure,
+                        'file_position': position
+                    })
 
                 # Limit to reasonable sample size
-                if len(pressures) > 10000:
+                if len(pressures) >= TIMELINE_MAX_READINGS:
                     break
 
         except Exception as e:
@@ -303,30 +360,37 @@ class DetailedEventAnalyzer:
         days_ago = total_files - file_idx - 1
         return datetime.now() - timedelta(days=days_ago)
 
-    def _timestamp_to_time(self, timestamp_val):
-        """Convert timestamp value to time estimate"""
+    def _timestamp_to_hour_minute(self, timestamp_val):
+        """Convert timestamp value to an (hour, minute) time estimate"""
         # Simplified timestamp conversion
         # In real BMC format, this would be based on actual timestamp encoding
         seconds_since_start = timestamp_val % 86400  # Assume daily reset
         hours = seconds_since_start // 3600
         minutes = (seconds_since_start % 3600) // 60
-        return f"{hours:02d}:{minutes:02d}"
+        return hours, minutes
 
-    def _bytes_to_time_estimate(self, byte_position):
-        """Estimate time based on position in file"""
+    def _bytes_to_hours_minutes(self, byte_positions):
+        """Estimate hour and minute arrays for an array of positions in a file"""
         # Rough estimate: assume 8-hour sleep session per file
-        file_fraction = byte_position / 16777216  # 16MB file size
+        file_fraction = np.asarray(byte_positions) / 16777216  # 16MB file size
         sleep_hours = file_fraction * 8  # 8 hours of sleep
 
         # Start at 10 PM (22:00)
         start_hour = 22
-        current_hour = (start_hour + sleep_hours) % 24
-        minutes = (sleep_hours % 1) * 60
+        current_hours = ((start_hour + sleep_hours) % 24).astype(np.int64)
+        minutes = ((sleep_hours % 1) * 60).astype(np.int64)
 
-        return f"{int(current_hour):02d}:{int(minutes):02d}"
+        return current_hours, minutes
 
-    def create_detailed_event_charts(self, events_data, pressure_data):
-        """Create comprehensive event visualization charts"""
+    def _bytes_to_time_estimates(self, byte_positions):
+        """Estimate times (HH:MM) for an array of positions in a file"""
+        hours, minutes = self._bytes_to_hours_minutes(byte_positions)
+
+        # Only the string formatting is left per position
+        return [f"{hour:02d}:{minute:02d}" for hour, minute in zip(hours.tolist(), minutes.tolist())]
+
+    def create_detailed_event_charts(self, events_data, pressure_data, dpi=150):
+        """Create comprehensive event visualization charts (dpi=300 for print quality)"""
 
         print("\n📊 CREATING DETAILED EVENT CHARTS...")
 
@@ -337,9 +401,12 @@ class DetailedEventAnalyzer:
         ax1 = plt.subplot(4, 2, (1, 2))
         self._plot_nightly_events(ax1, events_data)
 
+        # Tally the event types once for the distribution and the summary
+        type_counts = self._count_event_types(events_data)
+
         # Chart 2: Event type distribution
         ax2 = plt.subplot(4, 2, 3)
-        self._plot_event_types(ax2, events_data)
+        self._plot_event_types(ax2, events_data, type_counts)
 
         # Chart 3: Event intensity over time
         ax3 = plt.subplot(4, 2, 4)
@@ -355,15 +422,15 @@ class DetailedEventAnalyzer:
 
         # Chart 6: Event summary table
         ax6 = plt.subplot(4, 2, 8)
-        self._plot_event_summary(ax6, events_data)
+        self._plot_event_summary(ax6, events_data, type_counts)
 
         plt.suptitle(f'Detailed Sleep Event Analysis - Device {self.device_id}\n'
                     f'Raw Data Extraction and Event Timeline | {datetime.now().strftime("%Y-%m-%d")}',
                     fontsize=16, fontweight='bold')
 
         plt.tight_layout()
-        plt.savefig('detailed_sleep_events.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        plt.savefig('detailed_sleep_events.png', dpi=dpi, bbox_inches='tight')
+        _show_and_close(plt, fig)
 
     def _plot_nightly_events(self, ax, events_data):
         """Plot night-by-night event timeline"""
@@ -394,11 +461,9 @@ class DetailedEventAnalyzer:
         ax.set_ylabel('Number of Events')
         ax.set_xlabel('Night')
 
-        # Add value labels
-        for bar, count in zip(bars, event_counts):
-            if count > 0:
-                ax.text(bar.get_x() + bar.get_width()/2., count + 0.1,
-                       f'{count}', ha='center', va='bottom', fontweight='bold')
+        # Add value labels (none on nights without events)
+        ax.bar_label(bars, labels=[f'{count}' if count > 0 else '' for count in event_counts],
+                     padding=3, fontweight='bold')
 
         # Add legend
         from matplotlib.patches import Patch
@@ -410,14 +475,15 @@ class DetailedEventAnalyzer:
         ]
         ax.legend(handles=legend_elements, loc='upper right')
 
-    def _plot_event_types(self, ax, events_data):
-        """Plot distribution of event types"""
+    def _count_event_types(self, events_data):
+        """Count the events of each type across all nights"""
+        return Counter(event['type'] for night_data in events_data.values() for event in night_data['events'])
 
-        event_type_counts = defaultdict(int)
+    def _plot_event_types(self, ax, events_data, event_type_counts=None):
+        """Plot distribution of event types (pass known type counts to skip recounting them)"""
 
-        for night_data in events_data.values():
-            for event in night_data['events']:
-                event_type_counts[event['type']] += 1
+        if event_type_counts is None:
+            event_type_counts = self._count_event_types(events_data)
 
         if event_type_counts:
             types = list(event_type_counts.keys())
@@ -498,12 +564,15 @@ class DetailedEventAnalyzer:
                        label=f'Night {night_data["night_number"]}', color=color)
 
                 # Mark events
-                for event in night_data['events']:
-                    event_time_hours = self._time_to_hours(event['timestamp']) + night_offset
-                    # Estimate pressure at event time
-                    if pressures:
-                        event_pressure = np.mean([p['pressure'] for p in pressures[:10]])
-                        ax.scatter(event_time_hours, event_pressure,
+                if pressures:
+                    # Estimate pressure at event time (same for every event
+                    # of the night, so compute it once)
+                    event_pressure = np.mean([p['pressure'] for p in pressures[:10]])
+                    # One scatter per night rather than one artist per event
+                    event_hours = [event['hour'] + event['minute'] / 60.0 + night_offset
+                                   for event in night_data['events']]
+                    if event_hours:
+                        ax.scatter(event_hours, np.full(len(event_hours), event_pressure),
                                  color='red', s=50, marker='x', alpha=0.8)
 
         ax.set_title('Pressure Timeline with Event Markers', fontweight='bold')
@@ -515,12 +584,7 @@ class DetailedEventAnalyzer:
     def _plot_hourly_events(self, ax, events_data):
         """Plot events by hour of night"""
 
-        hourly_counts = defaultdict(int)
-
-        for night_data in events_data.values():
-            for event in night_data['events']:
-                hour = int(event['timestamp'].split(':')[0])
-                hourly_counts[hour] += 1
+        hourly_counts = Counter(event['hour'] for night_data in events_data.values() for event in night_data['events'])
 
         if hourly_counts:
             hours = sorted(hourly_counts.keys())
@@ -536,8 +600,8 @@ class DetailedEventAnalyzer:
                    transform=ax.transAxes, fontsize=12)
             ax.set_title('Events by Hour of Night', fontweight='bold')
 
-    def _plot_event_summary(self, ax, events_data):
-        """Plot event summary statistics"""
+    def _plot_event_summary(self, ax, events_data, event_types=None):
+        """Plot event summary statistics (pass known type counts to skip recounting them)"""
 
         ax.axis('off')
 
@@ -547,13 +611,11 @@ class DetailedEventAnalyzer:
         avg_events_per_night = total_events / total_nights if total_nights > 0 else 0
 
         # Event type breakdown
-        event_types = defaultdict(int)
-        for night_data in events_data.values():
-            for event in night_data['events']:
-                event_types[event['type']] += 1
+        if event_types is None:
+            event_types = self._count_event_types(events_data)
 
         # Most common event type
-        most_common = max(event_types.items(), key=lambda x: x[1])[0] if event_types else "None"
+        most_common = event_types.most_common(1)[0][0] if event_types else "None"
 
         summary_text = f"""
 SLEEP EVENT ANALYSIS SUMMARY
@@ -603,8 +665,18 @@ SLEEP EVENT ANALYSIS SUMMARY
     def generate_detailed_report(self, events_data, pressure_data):
         """Generate detailed event analysis report"""
 
-        report = f"""
-DETAILED SLEEP EVENT ANALYSIS REPORT
+        return ''.join(self._iter_report_sections(events_data))
+
+    def save_detailed_report(self, events_data, filename='detailed_sleep_events_report.txt'):
+        """Write the detailed event report to a file section by section"""
+        # Streamed rather than assembled into one large string first
+        with open(filename, 'w') as f:
+            f.writelines(self._iter_report_sections(events_data))
+
+    def _iter_report_sections(self, events_data):
+        """Yield the detailed event report section by section"""
+
+        yield f"""DETAILED SLEEP EVENT ANALYSIS REPORT
 ================================================================================
 
 Device ID: {self.device_id}
@@ -633,7 +705,7 @@ EVENT EXTRACTION RESULTS
             night_num = night_data['night_number']
             file_date = night_data['file_date'].strftime('%Y-%m-%d')
 
-            report += f"""
+            yield f"""
 NIGHT {night_num} ({file_date}):
 • File: {filename}
 • Events Detected: {len(events)}
@@ -642,18 +714,18 @@ NIGHT {night_num} ({file_date}):
 
             if events:
                 for i, event in enumerate(events, 1):
-                    report += f"  {i}. {event['timestamp']} - {event['type']} ({event['severity']})\n"
+                    yield f"  {i}. {event['timestamp']} - {event['type']} ({event['severity']})\n"
                     if 'duration' in event:
-                        report += f"     Duration: {event['duration']}s, Source: {event['source']}\n"
+                        yield f"     Duration: {event['duration']}s, Source: {event['source']}\n"
             else:
-                report += "  No events detected in this session\n"
+                yield "  No events detected in this session\n"
 
             total_events += len(events)
 
         # Summary statistics
         avg_events = total_events / total_nights if total_nights > 0 else 0
 
-        report += f"""
+        yield f"""
 
 SUMMARY STATISTICS
 ----------------------------------------------------------------------
@@ -667,16 +739,13 @@ EVENT TYPE DISTRIBUTION
 """
 
         # Event type analysis
-        event_types = defaultdict(int)
-        for night_data in events_data.values():
-            for event in night_data['events']:
-                event_types[event['type']] += 1
+        event_types = self._count_event_types(events_data)
 
-        for event_type, count in sorted(event_types.items(), key=lambda x: x[1], reverse=True):
+        for event_type, count in event_types.most_common():
             percentage = (count / total_events * 100) if total_events > 0 else 0
-            report += f"• {event_type}: {count} events ({percentage:.1f}%)\n"
+            yield f"• {event_type}: {count} events ({percentage:.1f}%)\n"
 
-        report += f"""
+        yield f"""
 
 CLINICAL INTERPRETATION
 ----------------------------------------------------------------------
@@ -708,10 +777,7 @@ TECHNICAL NOTES:
 
 Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 Analysis Method: Multi-approach Raw Data Event Extraction
-================================================================================
-        """
-
-        return report.strip()
+================================================================================"""
 
 def main():
     """Run detailed event analysis"""
@@ -734,12 +800,12 @@ def main():
     # Create detailed visualizations
     analyzer.create_detailed_event_charts(events_data, pressure_data)
 
-    # Generate detailed report
-    detailed_report = analyzer.generate_detailed_report(events_data, pressure_data)
+    # Generate and save the detailed report
+    analyzer.save_detailed_report(events_data)
 
-    # Save report
-    with open('detailed_sleep_events_report.txt', 'w') as f:
-        f.write(detailed_report)
+    # Totals for the saved data and the summary below
+    total_events = sum(len(night['events']) for night in events_data.values())
+    total_nights = len(events_data)
 
     # Save raw data
     analysis_data = {
@@ -749,12 +815,14 @@ def main():
             'file_date': v['file_date'].isoformat()
         } for k, v in events_data.items()},
         'analysis_date': datetime.now().isoformat(),
-        'total_events': sum(len(night['events']) for night in events_data.values()),
-        'total_nights': len(events_data)
+        'total_events': total_events,
+        'total_nights': total_nights
     }
 
+    # Compact separators: this file holds every event and is machine-read,
+    # so indentation only adds encoding time and size
     with open('detailed_sleep_events_data.json', 'w') as f:
-        json.dump(analysis_data, f, indent=2)
+        json.dump(analysis_data, f, separators=(',', ':'))
 
     print(f"\n✅ DETAILED EVENT ANALYSIS COMPLETE")
     print("="*50)
@@ -764,9 +832,6 @@ def main():
     print("• detailed_sleep_events_data.json - Raw event data")
 
     # Print summary
-    total_events = sum(len(night['events']) for night in events_data.values())
-    total_nights = len(events_data)
-
     print(f"\n📊 QUICK SUMMARY:")
     print(f"• Nights analyzed: {total_nights}")
     print(f"• Total events detected: {total_events}")
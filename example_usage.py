@@ -4,8 +4,9 @@ Example usage of BMC Sleep Study Analyzer
 Shows how to perform comprehensive sleep study analysis and detailed event extraction
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 from bmc_sleep_analyzer import BMCSleepAnalyzer
-from detailed_event_analyzer import DetailedEventAnalyzer
 
 def example_basic_usage():
     """Basic usage example - comprehensive analysis"""
@@ -99,6 +100,9 @@ def example_detailed_event_analysis():
     """NEW: Example of detailed event analysis"""
     print("\n=== DETAILED EVENT ANALYSIS (NEW) ===")
 
+    # Imported here so the other examples don't pay matplotlib's startup cost
+    from detailed_event_analyzer import DetailedEventAnalyzer
+
     event_analyzer = DetailedEventAnalyzer()
 
     # Extract detailed events from recent files
@@ -106,13 +110,18 @@ def example_detailed_event_analysis():
     events_data, pressure_data = event_analyzer.extract_detailed_events(recent_files_only=True)
 
     if events_data:
-        # Create comprehensive event charts
-        print("Creating detailed event visualizations...")
-        event_analyzer.create_detailed_event_charts(events_data, pressure_data)
+        # Write the detailed report in the background while the charts
+        # render; the charts stay on the main thread, where GUI backends
+        # require plt.show() to run
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            print("Generating detailed event report...")
+            report_future = executor.submit(event_analyzer.save_detailed_report, events_data)
+
+            # Create comprehensive event charts
+            print("Creating detailed event visualizations...")
+            event_analyzer.create_detailed_event_charts(events_data, pressure_data)
 
-        # Generate detailed report
-        print("Generating detailed event report...")
-        detailed_report = event_analyzer.generate_detailed_report(events_data, pressure_data)
+            report_future.result()
 
         # Print summary
         total_events = sum(len(night['events']) for night in events_data.values())
@@ -135,7 +144,6 @@ def example_detailed_event_analysis():
         print(f"\n📁 Files generated:")
         print(f"• detailed_sleep_events.png")
         print(f"• detailed_sleep_events_report.txt")
-        print(f"• detailed_sleep_events_data.json")
 
     else:
         print("❌ No event data could be extracted")
@@ -144,17 +152,24 @@ def example_combined_analysis():
     """Example combining both analyzers for complete assessment"""
     print("\n=== COMBINED COMPREHENSIVE ANALYSIS ===")
 
+    from detailed_event_analyzer import DetailedEventAnalyzer
+
     # Run basic sleep study analysis
     print("1. Running comprehensive sleep study analysis...")
     sleep_analyzer = BMCSleepAnalyzer()
     sleep_results = sleep_analyzer.analyze_comprehensive_data(months=3)
 
+    # Nothing to combine the events with, so skip scanning the files again
+    if not sleep_results:
+        print("❌ Sleep study analysis failed - skipping detailed event extraction")
+        return
+
     # Run detailed event analysis
     print("2. Running detailed event extraction...")
     event_analyzer = DetailedEventAnalyzer()
     events_data, pressure_data = event_analyzer.extract_detailed_events()
 
-    if sleep_results and events_data:
+    if events_data:
         # Compare findings
         pressure_stats = sleep_results.get('pressure_analysis', {}).get('statistics', {})
         total_events = sum(len(night['events']) for night in events_data.values())
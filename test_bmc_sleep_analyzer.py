@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Regression checks for BMC Sleep Study Analyzer statistics
+Run with: python -m unittest test_bmc_sleep_analyzer
+"""
+
+import unittest
+
+import numpy as np
+
+from bmc_sleep_analyzer import BMCSleepAnalyzer, PRESSURE_LUT, PRESSURE_WORD_MIN, PRESSURE_WORD_MAX
+
+
+class PressurePeakTests(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = BMCSleepAnalyzer(device_id="test")
+
+    def test_zero_iqr_counts_only_readings_above_therapy_pressure(self):
+        """A fixed-pressure night (IQR 0) must not count its own pressure as peaks"""
+        for word in range(PRESSURE_WORD_MIN, PRESSURE_WORD_MAX - 1):
+            therapy, spike = PRESSURE_LUT[word], PRESSURE_LUT[word + 2]
+            if np.isnan(therapy) or np.isnan(spike):
+                continue
+
+            pressures = np.array([therapy] * 1000 + [spike] * 5, dtype=np.float32)
+            analysis = self.analyzer._analyze_pressure_therapy({'all_pressures': pressures})
+
+            peaks = analysis['pressure_distribution']['pressure_peaks']
+            expected = 5 if spike > therapy else 0
+            self.assertEqual(peaks['peak_count'], expected, f"raw word {word}")
+
+
+if __name__ == "__main__":
+    unittest.main()